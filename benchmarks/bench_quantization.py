@@ -0,0 +1,100 @@
+"""Compares the int8 dynamically quantized text model against the fp32 baseline on CPU.
+
+Each variant is loaded in a fresh process, so the resident memory reported
+is the cost of that model alone. Agreement is the share of greedy tokens
+that match the fp32 output position by position.
+
+Usage: uv run python benchmarks/bench_quantization.py --max-new-tokens 64
+"""
+
+import argparse
+import multiprocessing
+import os
+import time
+
+import torch
+
+prompts = [
+    "Tell me a joke",
+    "How do I create a FastAPI endpoint that accepts a JSON body and validates it?",
+    "Explain dependency injection in FastAPI in two sentences.",
+]
+
+
+def rss_bytes() -> int:
+    # Linux only, resident set size of the current process
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def run_variant(quantization: str, max_new_tokens: int, results) -> None:
+    # imported here so the parent process never loads torch weights itself
+    from building_genai_services.generate.models import build_chat_prompt, load_text_model
+
+    baseline_rss = rss_bytes()
+    pipe = load_text_model(quantization=quantization)
+    loaded_rss = rss_bytes()
+
+    outputs, generated, seconds = [], 0, 0.0
+    for prompt in prompts:
+        inputs = pipe.tokenizer(build_chat_prompt(pipe.tokenizer, prompt), return_tensors="pt")
+        start_time = time.perf_counter()
+        with torch.inference_mode():
+            sequence = pipe.model.generate(
+                **inputs,
+                max_new_tokens=max_new_tokens,
+                do_sample=False,
+                pad_token_id=pipe.tokenizer.eos_token_id,
+            )[0]
+        seconds += time.perf_counter() - start_time
+        new_tokens = sequence[inputs.input_ids.shape[1] :].tolist()
+        generated += len(new_tokens)
+        outputs.append(new_tokens)
+
+    results.put(
+        {
+            "model_mb": (loaded_rss - baseline_rss) / 1024**2,
+            "peak_mb": rss_bytes() / 1024**2,
+            "tokens_per_second": generated / seconds,
+            "outputs": outputs,
+        },
+    )
+
+
+def measure(quantization: str, max_new_tokens: int) -> dict:
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=run_variant, args=(quantization, max_new_tokens, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def agreement(baseline: list[list[int]], candidate: list[list[int]]) -> float:
+    matches = total = 0
+    for expected, actual in zip(baseline, candidate):
+        total += max(len(expected), len(actual))
+        matches += sum(a == b for a, b in zip(expected, actual))
+    return matches / total if total else 1.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    args = parser.parse_args()
+
+    fp32 = measure("none", args.max_new_tokens)
+    int8 = measure("int8", args.max_new_tokens)
+
+    print(f"{'variant':<8} {'model (MB)':>11} {'RSS (MB)':>9} {'tokens/s':>9} {'agreement':>10}")
+    for name, result in (("fp32", fp32), ("int8", int8)):
+        print(
+            f"{name:<8} {result['model_mb']:>11.0f} {result['peak_mb']:>9.0f} "
+            f"{result['tokens_per_second']:>9.1f} "
+            f"{agreement(fp32['outputs'], result['outputs']):>10.1%}",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -13,35 +13,33 @@ from fastapi import (
 
 from building_genai_services.auth import router as auth_router
 from building_genai_services.generate import router as generate_router
+from building_genai_services.generate import text_batcher
+from building_genai_services.common.executors import model_executors
+from building_genai_services.common.kv_cache import conversation_kv_cache
+from building_genai_services.common.metrics import metrics
+from building_genai_services.common.registry import model_registry
 from building_genai_services.common.session import engine, init_db
+from building_genai_services.common.settings import settings
 from building_genai_services.conversations import (
     router as conversations_router,
 )
 
-########### Model loaded in memory for the entire app lifespan #################
+########### Models loaded in memory for the entire app lifespan #################
 
-# models = {}
-
-# @asynccontextmanager
-# async def lifespan(_: FastAPI) -> AsyncIterator[None]:
-#     models["text2image"] = load_image_model()
-#     models["text2text"] = load_text_model()
-
-#     yield
-
-#     ...  # Run cleanup code here
-
-
-#     models.clear()
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     # await init_db()
     # Database schema is managed by Alembic migrations
     # Run: alembic upgrade head
-    # other startup operations within the lifespan
-    ...
+    # models not listed in settings.resident_models are loaded on first use
+    await model_registry.load(settings.resident_models)
+    text_batcher.start()
     yield
+    await text_batcher.stop()
+    model_registry.clear()
+    conversation_kv_cache.clear()
+    model_executors.shutdown()
     await engine.dispose()
 
 
@@ -53,6 +51,10 @@ app.include_router(auth_router)
 app.include_router(generate_router)
 
 
+@app.get("/metrics", tags=["Monitoring"])
+def metrics_controller() -> dict:
+    return {**metrics.snapshot(), "models": model_registry.stats()}
+
 
 ################################################################################
 
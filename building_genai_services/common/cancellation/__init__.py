@@ -0,0 +1,11 @@
+from .cancellation import (
+    CancellationToken,
+    GenerationCancelled,
+    cancel_on_disconnect,
+)
+
+__all__ = [
+    "CancellationToken",
+    "GenerationCancelled",
+    "cancel_on_disconnect",
+]
@@ -0,0 +1,65 @@
+import asyncio
+import threading
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException, Request
+from loguru import logger
+
+from building_genai_services.common.metrics import metrics
+
+# nginx's non-standard "client closed request", recorded in usage.csv for cancelled work
+CLIENT_CLOSED_REQUEST = 499
+
+
+class GenerationCancelled(Exception):
+    """Raised from inside a model call once the client that asked for it has gone."""
+
+
+class CancellationToken:
+    """Thread-safe flag checked by model calls between decoding or denoising steps."""
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    def raise_if_cancelled(self) -> None:
+        if self.cancelled:
+            raise GenerationCancelled()
+
+
+@asynccontextmanager
+async def cancel_on_disconnect(request: Request) -> AsyncIterator[CancellationToken]:
+    """Cancels the yielded token when the client disconnects and turns the cancellation into a 499.
+
+    Only for regular responses whose body has already been read, streaming
+    responses watch for disconnects themselves.
+    """
+    cancellation = CancellationToken()
+
+    async def watch() -> None:
+        # request.is_disconnected() never sees the disconnect behind BaseHTTPMiddleware,
+        # once the body is consumed the only message left to receive is the disconnect
+        while (await request.receive())["type"] != "http.disconnect":
+            pass
+        cancellation.cancel()
+
+    watcher = asyncio.create_task(watch())
+    try:
+        yield cancellation
+        cancellation.raise_if_cancelled()
+    except GenerationCancelled:
+        logger.info(f"Cancelled {request.url.path} after the client disconnected")
+        metrics.increment("generation_cancelled_total", endpoint=request.url.path)
+        raise HTTPException(
+            detail="Client closed request",
+            status_code=CLIENT_CLOSED_REQUEST,
+        )
+    finally:
+        watcher.cancel()
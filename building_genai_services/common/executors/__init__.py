@@ -0,0 +1,6 @@
+from .executors import ModelExecutors, model_executors
+
+__all__ = [
+    "ModelExecutors",
+    "model_executors",
+]
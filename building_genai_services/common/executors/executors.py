@@ -0,0 +1,71 @@
+import asyncio
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Literal
+
+from building_genai_services.common.metrics import metrics
+from building_genai_services.common.settings import settings
+
+ExecutorKind = Literal["thread", "process"]
+
+
+class ModelExecutors:
+    """Bounded executor pools, one per model, that keep blocking inference off the event loop.
+
+    Thread pools suit torch inference, which releases the GIL and can share
+    the models held by the registry. Process pools only accept picklable
+    functions and arguments, so they suit pure Python work such as PDF parsing.
+    """
+
+    def __init__(
+        self,
+        workers: dict[str, int] | None = None,
+        kinds: dict[str, ExecutorKind] | None = None,
+        default_workers: int = 1,
+    ) -> None:
+        self.workers = workers or {}
+        self.kinds = kinds or {}
+        self.default_workers = default_workers
+        self._executors: dict[str, Executor] = {}
+        self._inflight: dict[str, int] = {}
+
+    def get(self, name: str) -> Executor:
+        if name not in self._executors:
+            max_workers = self.workers.get(name, self.default_workers)
+            if self.kinds.get(name, "thread") == "process":
+                self._executors[name] = ProcessPoolExecutor(max_workers=max_workers)
+            else:
+                self._executors[name] = ThreadPoolExecutor(
+                    max_workers=max_workers,
+                    thread_name_prefix=f"executor-{name}",
+                )
+        return self._executors[name]
+
+    def inflight(self, name: str) -> int:
+        return self._inflight.get(name, 0)
+
+    async def run(self, name: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        self._inflight[name] = self.inflight(name) + 1
+        metrics.set_gauge("executor_inflight", self._inflight[name], pool=name)
+        start_time = time.perf_counter()
+        try:
+            return await loop.run_in_executor(self.get(name), partial(fn, *args, **kwargs))
+        finally:
+            self._inflight[name] -= 1
+            metrics.set_gauge("executor_inflight", self._inflight[name], pool=name)
+            metrics.observe("executor_run_seconds", time.perf_counter() - start_time, pool=name)
+
+    def shutdown(self) -> None:
+        for executor in self._executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._executors.clear()
+
+
+model_executors = ModelExecutors(
+    workers=settings.executor_workers,
+    kinds=settings.executor_kinds,
+    default_workers=settings.executor_default_workers,
+)
@@ -0,0 +1,7 @@
+from .kv_cache import ConversationKVCache, cache_nbytes, conversation_kv_cache
+
+__all__ = [
+    "ConversationKVCache",
+    "cache_nbytes",
+    "conversation_kv_cache",
+]
@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from loguru import logger
+
+from building_genai_services.common.metrics import metrics
+from building_genai_services.common.settings import settings
+
+
+def cache_nbytes(past_key_values: Any) -> int:
+    # transformers >= 4.56 stores per-layer keys/values, older releases keep two lists
+    if (layers := getattr(past_key_values, "layers", None)) is not None:
+        tensors = [t for layer in layers for t in (layer.keys, layer.values) if t is not None]
+    else:
+        tensors = [*past_key_values.key_cache, *past_key_values.value_cache]
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+@dataclass
+class ConversationCacheEntry:
+    # token ids covered by past_key_values
+    input_ids: Any
+    past_key_values: Any
+    nbytes: int
+    created_at: float
+
+
+class ConversationKVCache:
+    """LRU store of per-conversation attention caches bounded by memory and TTL.
+
+    Entries are taken out while a turn is generated, so concurrent turns of the
+    same conversation never mutate the same cache; the loser re-encodes in full.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float) -> None:
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        # least recently used first
+        self._entries: OrderedDict[int, ConversationCacheEntry] = OrderedDict()
+        # entries are taken and put back from executor threads
+        self._lock = threading.Lock()
+
+    @property
+    def used_bytes(self) -> int:
+        return sum(entry.nbytes for entry in self._entries.values())
+
+    def take(self, conversation_id: int) -> ConversationCacheEntry | None:
+        with self._lock:
+            entry = self._entries.pop(conversation_id, None)
+            self._update_gauges()
+        if entry is None or entry.created_at < time.time() - self.ttl_seconds:
+            metrics.increment("conversation_kv_cache_misses_total")
+            return None
+        metrics.increment("conversation_kv_cache_hits_total")
+        return entry
+
+    def put(self, conversation_id: int, input_ids: Any, past_key_values: Any) -> None:
+        entry = ConversationCacheEntry(
+            input_ids=input_ids,
+            past_key_values=past_key_values,
+            nbytes=cache_nbytes(past_key_values),
+            created_at=time.time(),
+        )
+        if entry.nbytes > self.max_bytes:
+            logger.debug(f"KV cache of conversation {conversation_id} exceeds the memory limit")
+            return
+        with self._lock:
+            self._entries[conversation_id] = entry
+            while self.used_bytes > self.max_bytes:
+                self._entries.popitem(last=False)
+                metrics.increment("conversation_kv_cache_evictions_total")
+            self._update_gauges()
+
+    def invalidate(self, conversation_id: int) -> None:
+        with self._lock:
+            if self._entries.pop(conversation_id, None) is not None:
+                logger.debug(f"Invalidated KV cache of conversation {conversation_id}")
+            self._update_gauges()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._update_gauges()
+
+    def _update_gauges(self) -> None:
+        metrics.set_gauge("conversation_kv_cache_entries", len(self._entries))
+        metrics.set_gauge("conversation_kv_cache_bytes", self.used_bytes)
+
+
+conversation_kv_cache = ConversationKVCache(
+    max_bytes=settings.conversation_kv_cache_max_mb * 1024 * 1024,
+    ttl_seconds=settings.conversation_kv_cache_ttl_seconds,
+)
@@ -0,0 +1,6 @@
+from .metrics import Metrics, metrics
+
+__all__ = [
+    "Metrics",
+    "metrics",
+]
@@ -0,0 +1,72 @@
+import threading
+from collections import defaultdict
+
+
+def metric_key(name: str, labels: dict[str, str]) -> str:
+    if not labels:
+        return name
+    formatted = ",".join(f'{key}="{value}"' for key, value in sorted(labels.items()))
+    return f"{name}{{{formatted}}}"
+
+
+class Summary:
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def to_dict(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "avg": round(self.total / self.count, 6) if self.count else 0.0,
+            "min": round(self.min, 6) if self.count else 0.0,
+            "max": round(self.max, 6) if self.count else 0.0,
+        }
+
+
+class Metrics:
+    """In-process counters, gauges and summaries shared by every module."""
+
+    def __init__(self) -> None:
+        # metrics are updated from the event loop and from executor threads
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = defaultdict(float)
+        self._gauges: dict[str, float] = {}
+        self._summaries: dict[str, Summary] = defaultdict(Summary)
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        with self._lock:
+            self._counters[metric_key(name, labels)] += value
+
+    def set_gauge(self, name: str, value: float, **labels: str) -> None:
+        with self._lock:
+            self._gauges[metric_key(name, labels)] = value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        with self._lock:
+            self._summaries[metric_key(name, labels)].observe(value)
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "summaries": {key: s.to_dict() for key, s in self._summaries.items()},
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._summaries.clear()
+
+
+metrics = Metrics()
@@ -0,0 +1,7 @@
+from .registry import ModelRegistry, ModelRegistryDep, model_registry
+
+__all__ = [
+    "ModelRegistry",
+    "ModelRegistryDep",
+    "model_registry",
+]
@@ -0,0 +1,179 @@
+import asyncio
+import gc
+import itertools
+import time
+from collections import OrderedDict, defaultdict
+from collections.abc import AsyncIterator, Callable, Iterable
+from contextlib import asynccontextmanager
+from typing import Annotated, Any
+
+from fastapi import Depends
+from loguru import logger
+
+from building_genai_services.common.executors import model_executors
+from building_genai_services.common.metrics import metrics
+from building_genai_services.common.settings import settings
+
+
+def packed_weight_bytes(module: Any) -> int:
+    # dynamically quantized linear layers keep their int8 weights outside parameters()
+    total = 0
+    for submodule in getattr(module, "modules", list)():
+        packed = getattr(submodule, "_packed_params", None)
+        if not hasattr(packed, "_weight_bias"):
+            continue
+        total += sum(t.numel() * t.element_size() for t in packed._weight_bias() if t is not None)
+    return total
+
+
+def estimate_model_bytes(model: Any, seen: set[int] | None = None) -> int:
+    # Walks torch modules, transformers pipelines (.model), diffusers pipelines
+    # (.components) and tuples such as (processor, model) to sum tensor sizes
+    seen = set() if seen is None else seen
+    if model is None or id(model) in seen:
+        return 0
+    seen.add(id(model))
+    if hasattr(model, "parameters") and hasattr(model, "buffers"):
+        tensors = itertools.chain(model.parameters(), model.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors) + packed_weight_bytes(model)
+    if isinstance(model, (tuple, list)):
+        return sum(estimate_model_bytes(m, seen) for m in model)
+    if isinstance(components := getattr(model, "components", None), dict):
+        return sum(estimate_model_bytes(c, seen) for c in components.values())
+    return estimate_model_bytes(getattr(model, "model", None), seen)
+
+
+class ModelRegistry:
+    """Lazily loads models and evicts the least recently used ones to stay within a RAM budget.
+
+    Models are checked out with ``acquire``; a model that is checked out is
+    serving a request and is never evicted.
+    """
+
+    def __init__(self, memory_budget_bytes: int | None = None) -> None:
+        self.memory_budget_bytes = memory_budget_bytes
+        self._loaders: dict[str, Callable[[], Any]] = {}
+        # least recently used first
+        self._models: OrderedDict[str, Any] = OrderedDict()
+        # last measured size of each model, kept after eviction to make room before reloading
+        self._sizes: dict[str, int] = {}
+        self._pins: dict[str, int] = defaultdict(int)
+        self._lock = asyncio.Lock()
+
+    def register(self, name: str, loader: Callable[[], Any]) -> None:
+        self._loaders[name] = loader
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._models
+
+    @property
+    def used_bytes(self) -> int:
+        return sum(self._sizes.get(name, 0) for name in self._models)
+
+    @asynccontextmanager
+    async def acquire(self, name: str) -> AsyncIterator[Any]:
+        model = await self._checkout(name)
+        try:
+            yield model
+        finally:
+            self._pins[name] -= 1
+
+    async def load(self, names: Iterable[str]) -> None:
+        for name in names:
+            async with self.acquire(name):
+                pass
+
+    def clear(self) -> None:
+        self._models.clear()
+        self._update_gauges()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "memory_budget_bytes": self.memory_budget_bytes,
+            "memory_used_bytes": self.used_bytes,
+            "models": {
+                name: {
+                    "resident": name in self._models,
+                    "bytes": self._sizes.get(name),
+                    "in_use": self._pins[name],
+                }
+                for name in self._loaders
+            },
+        }
+
+    async def _checkout(self, name: str) -> Any:
+        if name not in self._loaders:
+            raise KeyError(f"Model {name} is not registered")
+        if name in self._models:
+            return self._hit(name)
+        async with self._lock:
+            # another request may have loaded the model while we were waiting
+            if name in self._models:
+                return self._hit(name)
+            metrics.increment("model_cache_misses_total", model=name)
+            self._evict(incoming_bytes=self._sizes.get(name, 0))
+            logger.info(f"Loading model {name}")
+            start_time = time.perf_counter()
+            model = await model_executors.run(name, self._loaders[name])
+            load_time = time.perf_counter() - start_time
+            metrics.observe("model_load_seconds", load_time, model=name)
+            self._sizes[name] = estimate_model_bytes(model)
+            logger.info(
+                f"Loaded model {name} ({self._sizes[name] / 1e6:.0f} MB) in {load_time:.2f}s",
+            )
+            self._models[name] = model
+            self._pins[name] += 1
+            # the real size is only known once loaded
+            self._evict()
+            self._update_gauges()
+            return model
+
+    def _hit(self, name: str) -> Any:
+        metrics.increment("model_cache_hits_total", model=name)
+        self._models.move_to_end(name)
+        self._pins[name] += 1
+        return self._models[name]
+
+    def _evict(self, incoming_bytes: int = 0) -> None:
+        if self.memory_budget_bytes is None:
+            return
+        while self.used_bytes + incoming_bytes > self.memory_budget_bytes:
+            candidates = [name for name in self._models if self._pins[name] == 0]
+            if not candidates:
+                logger.warning(
+                    "Model memory budget exceeded but every resident model is serving a request",
+                )
+                return
+            name = candidates[0]
+            logger.info(f"Evicting least recently used model {name}")
+            del self._models[name]
+            metrics.increment("model_evictions_total", model=name)
+            gc.collect()
+        self._update_gauges()
+
+    def _update_gauges(self) -> None:
+        metrics.set_gauge("model_memory_used_bytes", self.used_bytes)
+        for name in self._loaders:
+            resident = name in self._models
+            metrics.set_gauge("model_resident", int(resident), model=name)
+            metrics.set_gauge(
+                "model_resident_bytes",
+                self._sizes.get(name, 0) if resident else 0,
+                model=name,
+            )
+
+
+model_registry = ModelRegistry(
+    memory_budget_bytes=(
+        settings.model_memory_budget_mb * 1024 * 1024
+        if settings.model_memory_budget_mb is not None
+        else None
+    ),
+)
+
+
+def get_model_registry() -> ModelRegistry:
+    return model_registry
+
+
+ModelRegistryDep = Annotated[ModelRegistry, Depends(get_model_registry)]
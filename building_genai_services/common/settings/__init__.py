@@ -0,0 +1,6 @@
+from .settings import Settings, settings
+
+__all__ = [
+    "Settings",
+    "settings",
+]
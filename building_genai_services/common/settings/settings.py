@@ -0,0 +1,84 @@
+import json
+import os
+from typing import Annotated, Any, Literal
+
+from pydantic import BaseModel, BeforeValidator, ConfigDict
+
+# Every field can be overridden with an environment variable, e.g.
+# GENAI_RESIDENT_MODELS=text2text,text2image
+ENV_PREFIX = "GENAI_"
+
+
+def split_csv(value: Any) -> Any:
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(",") if item.strip()]
+    return value
+
+
+def parse_json(value: Any) -> Any:
+    if isinstance(value, str):
+        return json.loads(value)
+    return value
+
+
+CsvList = Annotated[list[str], BeforeValidator(split_csv)]
+JsonDict = Annotated[dict[str, Any], BeforeValidator(parse_json)]
+
+
+class Settings(BaseModel):
+    model_config = ConfigDict(extra="ignore", protected_namespaces=())
+
+    # models loaded during the app lifespan startup, the rest load on first use
+    resident_models: CsvList = ["text2text"]
+    # RAM budget for resident models, least recently used models are evicted beyond it
+    model_memory_budget_mb: int | None = None
+
+    # dynamic micro-batching of /generate/text requests
+    text_batch_max_size: int = 8
+    text_batch_max_wait_ms: float = 20
+
+    # executor pool per model, e.g. GENAI_EXECUTOR_WORKERS='{"text2image": 2}'
+    executor_default_workers: int = 1
+    executor_workers: JsonDict = {}
+    # "thread" (default) or "process" per pool
+    executor_kinds: JsonDict = {}
+
+    # exact-match cache of /generate/text responses, "sqlite" shares it across workers
+    response_cache_backend: Literal["memory", "sqlite", "none"] = "memory"
+    response_cache_path: str = "response_cache.sqlite3"
+    response_cache_ttl_seconds: float = 3600
+    response_cache_max_entries: int = 1024
+    # only requests at or below this temperature are served from the cache
+    response_cache_max_temperature: float = 0.2
+
+    # near-duplicate prompt cache, compares jina embeddings of the prompt
+    semantic_cache_similarity_threshold: float = 0.95
+    semantic_cache_max_entries: int = 1024
+    semantic_cache_ttl_seconds: float = 3600
+    semantic_cache_max_temperature: float = 0.2
+
+    # reuse the precomputed KV cache of static prompt prefixes such as the system prompt
+    prefix_cache_enabled: bool = True
+
+    # prompt lookup decoding, drafts up to num_tokens following a matching n-gram of the prompt
+    prompt_lookup_num_tokens: int = 10
+    prompt_lookup_max_ngram: int = 3
+
+    # "int8" dynamically quantizes the linear layers of the text model, CPU only
+    text_model_quantization: Literal["none", "int8"] = "none"
+
+    # per-conversation attention caches reused across /generate/message turns
+    conversation_kv_cache_max_mb: int = 512
+    conversation_kv_cache_ttl_seconds: float = 1800
+
+
+def load_settings() -> Settings:
+    overrides = {
+        key.removeprefix(ENV_PREFIX).lower(): value
+        for key, value in os.environ.items()
+        if key.startswith(ENV_PREFIX)
+    }
+    return Settings.model_validate(overrides)
+
+
+settings = load_settings()
@@ -1,6 +1,8 @@
 from .router import GetConversationDep, router, store_message
+from .services import ConversationService
 
 __all__ = [
+    "ConversationService",
     "GetConversationDep",
     "router",
     "store_message",
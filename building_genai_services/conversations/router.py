@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from building_genai_services.common.entities import Conversation
+from building_genai_services.common.kv_cache import conversation_kv_cache
 from building_genai_services.common.session import DBSessionDep
 
 from .repository import ConversationRepository, MessageRepository
@@ -91,6 +92,7 @@ async def update_conversation_controller(
         conversation.id,
         updated_conversation,
     )
+    conversation_kv_cache.invalidate(conversation.id)
     return ConversationOut.model_validate(updated_conversation)
 
 
@@ -100,6 +102,7 @@ async def delete_conversation_controller(
     session: DBSessionDep,
 ) -> None:
     await ConversationRepository(session).delete(conversation.id)
+    conversation_kv_cache.invalidate(conversation.id)
 
 
 @router.get("/{conversation_id}/messages")
@@ -5,7 +5,10 @@ from .repository import ConversationRepository, Message
 
 class ConversationService(ConversationRepository):
     async def list_messages(self, conversation_id: int) -> list[Message]:
-        result = await self.session.execute(
-            select(Message).where(Message.conversation_id == conversation_id)
-        )
+        async with self.session.begin():
+            result = await self.session.execute(
+                select(Message)
+                .where(Message.conversation_id == conversation_id)
+                .order_by(Message.id),
+            )
         return [m for m in result.scalars().all()]
@@ -1,3 +1,7 @@
+from .batching import text_batcher
 from .router import router
 
-__all__ = ["router"]
+__all__ = [
+    "router",
+    "text_batcher",
+]
@@ -0,0 +1,145 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Annotated
+
+from fastapi import Depends
+from loguru import logger
+
+from building_genai_services.common.cancellation import CancellationToken, GenerationCancelled
+from building_genai_services.common.executors import model_executors
+from building_genai_services.common.metrics import metrics
+from building_genai_services.common.registry import ModelRegistry, model_registry
+from building_genai_services.common.settings import settings
+
+from .models import generate_texts
+
+
+@dataclass
+class TextGenerationJob:
+    prompt: str
+    temperature: float
+    future: asyncio.Future[str]
+    cancellation: CancellationToken | None = None
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class TextBatcher:
+    """Collects concurrent text generation requests into a single padded pipeline call.
+
+    A batch is dispatched once ``max_batch_size`` requests are queued or
+    ``max_wait_ms`` has elapsed since the first request of the batch arrived.
+    """
+
+    def __init__(
+        self,
+        models: ModelRegistry,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 20,
+    ) -> None:
+        self.models = models
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.queue: asyncio.Queue[TextGenerationJob] = asyncio.Queue()
+        self._worker: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    async def submit(
+        self,
+        prompt: str,
+        temperature: float,
+        cancellation: CancellationToken | None = None,
+    ) -> str:
+        self.start()
+        job = TextGenerationJob(
+            prompt=prompt,
+            temperature=temperature,
+            future=asyncio.get_running_loop().create_future(),
+            cancellation=cancellation,
+        )
+        await self.queue.put(job)
+        metrics.set_gauge("text_batch_queue_depth", self.queue.qsize())
+        return await job.future
+
+    async def _collect(self) -> list[TextGenerationJob]:
+        batch = [await self.queue.get()]
+        deadline = time.perf_counter() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        metrics.set_gauge("text_batch_queue_depth", self.queue.qsize())
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            # requests whose client went away are dropped before spending compute on them
+            for job in batch:
+                if job.cancellation is not None and job.cancellation.cancelled and not job.future.done():
+                    job.future.set_exception(GenerationCancelled())
+            batch = [job for job in batch if not job.future.done()]
+            if batch:
+                await self._process(batch)
+
+    async def _process(self, batch: list[TextGenerationJob]) -> None:
+        dispatched_at = time.perf_counter()
+        metrics.observe("text_batch_size", len(batch))
+        for job in batch:
+            metrics.observe("text_batch_queue_wait_seconds", dispatched_at - job.enqueued_at)
+        logger.debug(f"Dispatching a text generation batch of {len(batch)} requests")
+        try:
+            async with self.models.acquire("text2text") as pipe:
+                outputs = await model_executors.run(
+                    "text2text",
+                    generate_texts,
+                    pipe,
+                    [job.prompt for job in batch],
+                    [job.temperature for job in batch],
+                    # cancelled rows stop decoding while the rest of the batch carries on
+                    cancellations=[job.cancellation for job in batch],
+                )
+        except Exception as e:
+            logger.error(f"Text generation batch failed - Error: {e}")
+            for job in batch:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            return
+        for job, output in zip(batch, outputs):
+            if job.future.done():
+                continue
+            if job.cancellation is not None and job.cancellation.cancelled:
+                job.future.set_exception(GenerationCancelled())
+            else:
+                job.future.set_result(output)
+
+
+text_batcher = TextBatcher(
+    model_registry,
+    max_batch_size=settings.text_batch_max_size,
+    max_wait_ms=settings.text_batch_max_wait_ms,
+)
+
+
+def get_text_batcher() -> TextBatcher:
+    return text_batcher
+
+
+TextBatcherDep = Annotated[TextBatcher, Depends(get_text_batcher)]
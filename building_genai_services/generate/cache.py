@@ -0,0 +1,205 @@
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Annotated, Any
+
+from fastapi import Depends
+
+from building_genai_services.common.metrics import metrics
+from building_genai_services.common.settings import settings
+
+
+class CacheBackend(ABC):
+    name: str
+
+    @abstractmethod
+    async def get(self, key: str) -> str | None:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: str) -> None:
+        pass
+
+    @abstractmethod
+    async def clear(self) -> None:
+        pass
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Per-process LRU cache with a TTL."""
+
+    name = "memory"
+
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # key -> (expires_at, value), least recently used first
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    async def get(self, key: str) -> str | None:
+        if (entry := self._entries.get(key)) is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str) -> None:
+        self._entries[key] = (time.time() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """Cache stored in a SQLite file so every worker process on a node shares it."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """,
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_response_cache_accessed_at "
+                "ON response_cache (accessed_at)",
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # a connection per call keeps the backend safe to use from any thread
+        return sqlite3.connect(self.path, timeout=5)
+
+    def _get(self, key: str) -> str | None:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM response_cache WHERE key = ? AND expires_at >= ?",
+                (key, now),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE response_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def _set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO response_cache VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl_seconds, now),
+            )
+            conn.execute("DELETE FROM response_cache WHERE expires_at < ?", (now,))
+            conn.execute(
+                """
+                DELETE FROM response_cache WHERE key IN (
+                    SELECT key FROM response_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+
+    def _clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM response_cache")
+
+    async def get(self, key: str) -> str | None:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: str) -> None:
+        await asyncio.to_thread(self._set, key, value)
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._clear)
+
+
+def normalize_prompt(prompt: str) -> str:
+    return re.sub(r"\s+", " ", prompt).strip()
+
+
+class ResponseCache:
+    """Exact-match cache of generated text for low temperature (near deterministic) requests."""
+
+    def __init__(self, backend: CacheBackend | None, max_temperature: float) -> None:
+        self.backend = backend
+        self.max_temperature = max_temperature
+
+    def is_cacheable(self, temperature: float) -> bool:
+        return self.backend is not None and temperature <= self.max_temperature
+
+    @staticmethod
+    def key(
+        model: str,
+        prompt: str,
+        temperature: float,
+        context: str,
+        sampling_params: dict[str, Any],
+    ) -> str:
+        payload = json.dumps(
+            {
+                "model": model,
+                "prompt": normalize_prompt(prompt),
+                "temperature": temperature,
+                "context": context,
+                "sampling_params": sampling_params,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> str | None:
+        value = await self.backend.get(key)
+        if value is None:
+            metrics.increment("response_cache_misses_total", backend=self.backend.name)
+        else:
+            metrics.increment("response_cache_hits_total", backend=self.backend.name)
+        return value
+
+    async def set(self, key: str, value: str) -> None:
+        await self.backend.set(key, value)
+
+
+def create_cache_backend() -> CacheBackend | None:
+    if settings.response_cache_backend == "memory":
+        return InMemoryCacheBackend(
+            settings.response_cache_ttl_seconds,
+            settings.response_cache_max_entries,
+        )
+    if settings.response_cache_backend == "sqlite":
+        return SQLiteCacheBackend(
+            settings.response_cache_path,
+            settings.response_cache_ttl_seconds,
+            settings.response_cache_max_entries,
+        )
+    return None
+
+
+response_cache = ResponseCache(create_cache_backend(), settings.response_cache_max_temperature)
+
+
+def get_response_cache() -> ResponseCache:
+    return response_cache
+
+
+ResponseCacheDep = Annotated[ResponseCache, Depends(get_response_cache)]
@@ -0,0 +1,41 @@
+from collections.abc import AsyncIterator
+from typing import Annotated
+
+from diffusers import StableDiffusionInpaintPipelineLegacy, StableVideoDiffusionPipeline
+from fastapi import Depends
+from transformers import BarkModel, BarkProcessor, Pipeline
+
+from building_genai_services.common.registry import ModelRegistryDep
+
+
+# Models stay checked out until the response is sent so they can't be evicted mid-request
+async def get_text_model(models: ModelRegistryDep) -> AsyncIterator[Pipeline]:
+    async with models.acquire("text2text") as pipe:
+        yield pipe
+
+
+async def get_audio_model(
+    models: ModelRegistryDep,
+) -> AsyncIterator[tuple[BarkProcessor, BarkModel]]:
+    async with models.acquire("text2audio") as model:
+        yield model
+
+
+async def get_image_model(
+    models: ModelRegistryDep,
+) -> AsyncIterator[StableDiffusionInpaintPipelineLegacy]:
+    async with models.acquire("text2image") as pipe:
+        yield pipe
+
+
+async def get_video_model(
+    models: ModelRegistryDep,
+) -> AsyncIterator[StableVideoDiffusionPipeline]:
+    async with models.acquire("image2video") as pipe:
+        yield pipe
+
+
+TextModelDep = Annotated[Pipeline, Depends(get_text_model)]
+AudioModelDep = Annotated[tuple[BarkProcessor, BarkModel], Depends(get_audio_model)]
+ImageModelDep = Annotated[StableDiffusionInpaintPipelineLegacy, Depends(get_image_model)]
+VideoModelDep = Annotated[StableVideoDiffusionPipeline, Depends(get_video_model)]
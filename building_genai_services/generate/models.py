@@ -1,3 +1,5 @@
+import time
+
 import aiohttp
 import numpy as np
 import torch
@@ -9,9 +11,33 @@ from diffusers import (
 )
 from loguru import logger
 from PIL import Image
-from transformers import AutoModel, AutoProcessor, BarkModel, BarkProcessor, Pipeline, pipeline
+from transformers import (
+    AutoModel,
+    AutoProcessor,
+    BarkModel,
+    BarkProcessor,
+    DynamicCache,
+    LogitsProcessor,
+    LogitsProcessorList,
+    Pipeline,
+    PreTrainedTokenizerBase,
+    StoppingCriteria,
+    StoppingCriteriaList,
+    TopKLogitsWarper,
+    TopPLogitsWarper,
+    pipeline,
+)
+from transformers.generation.streamers import BaseStreamer
 
-from .schemas import VoicePresets
+from building_genai_services.common.cancellation import CancellationToken
+from building_genai_services.common.kv_cache import conversation_kv_cache
+from building_genai_services.common.metrics import metrics
+from building_genai_services.common.registry import model_registry
+from building_genai_services.common.settings import settings
+
+from .prefix_cache import common_prefix_length, prefix_cache
+from .prompt_lookup import prompt_lookup_generate
+from .schemas import TextModelQuantization, VoicePresets
 
 # Logic updated for Apple Silicon (MPS)
 if torch.backends.mps.is_available():
@@ -29,8 +55,26 @@ chatbot responsible for teaching FastAPI to your users.
 Always respond in markdown.
 """
 
+# sampling parameters shared by every text generation, also part of the response cache key
+text_generation_params = {"max_new_tokens": 256, "top_k": 50, "top_p": 0.95}
+
+
+def text_model_quantization() -> TextModelQuantization:
+    # dynamic int8 kernels only exist on CPU, accelerators keep using bfloat16
+    return settings.text_model_quantization if device.type == "cpu" else "none"
+
+
+def quantize_text_model(model: torch.nn.Module) -> torch.nn.Module:
+    # weights are stored as int8 and activations quantized on the fly, a quarter of the fp32 RAM
+    return torch.ao.quantization.quantize_dynamic(
+        model,
+        {torch.nn.Linear},
+        dtype=torch.qint8,
+        inplace=True,
+    )
 
-def load_text_model():
+
+def load_text_model(quantization: TextModelQuantization | None = None):
     # prefer lower-precision dtypes only on accelerators
     torch_dtype = torch.bfloat16 if device.type in ("mps", "cuda") else torch.float32
     pipe = pipeline(
@@ -40,29 +84,235 @@ def load_text_model():
         # Note: device_map="auto" is often better for M-series chips
         device=device,
     )
+    if (quantization or text_model_quantization()) == "int8":
+        logger.info("Quantizing the linear layers of the text model to int8")
+        quantize_text_model(pipe.model)
     return pipe
 
 
-def generate_text(pipe: Pipeline, prompt: str, temperature: float = 0.7) -> str:
+class BatchTemperatureLogitsWarper(LogitsProcessor):
+    """Applies a different sampling temperature to each row of a padded batch."""
+
+    def __init__(self, temperatures: list[float]) -> None:
+        # HF rejects a zero temperature, clamp to a near greedy value instead
+        self.temperatures = torch.tensor([max(t, 1e-5) for t in temperatures])
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor) -> torch.FloatTensor:
+        temperatures = self.temperatures.to(device=scores.device, dtype=scores.dtype)
+        return scores / temperatures.unsqueeze(1)
+
+
+def build_logits_processor(temperatures: list[float]) -> LogitsProcessorList:
+    # temperature, top_k and top_p are applied per row by our own warpers in the
+    # same order HF uses, so the built-in ones are disabled in generate()
+    return LogitsProcessorList(
+        [
+            BatchTemperatureLogitsWarper(temperatures),
+            TopKLogitsWarper(top_k=text_generation_params["top_k"]),
+            TopPLogitsWarper(top_p=text_generation_params["top_p"]),
+        ],
+    )
+
+
+class CancellationStoppingCriteria(StoppingCriteria):
+    """Finishes the rows of a batch whose requests were cancelled, generation ends once all are."""
+
+    def __init__(self, cancellations: list[CancellationToken | None]) -> None:
+        self.cancellations = cancellations
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> torch.BoolTensor:
+        cancelled = [c is not None and c.cancelled for c in self.cancellations]
+        return torch.tensor(cancelled, dtype=torch.bool, device=input_ids.device)
+
+
+def build_stopping_criteria(cancellations: list[CancellationToken | None]) -> StoppingCriteriaList:
+    return StoppingCriteriaList([CancellationStoppingCriteria(cancellations)])
+
+
+def cancellation_callback(cancellation: CancellationToken | None):
+    # diffusers calls this after every denoising step, raising aborts the pipeline call
+    if cancellation is None:
+        return None
+
+    def on_step_end(pipe, step: int, timestep, callback_kwargs: dict) -> dict:
+        cancellation.raise_if_cancelled()
+        return callback_kwargs
+
+    return on_step_end
+
+
+def build_chat_prompt(tokenizer: PreTrainedTokenizerBase, prompt: str) -> str:
     messages = [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": prompt},
     ]
-    prompt = pipe.tokenizer.apply_chat_template(
+    return tokenizer.apply_chat_template(
         messages,
         tokenize=False,
         add_generation_prompt=True,
     )
-    predictions = pipe(
-        prompt,
-        temperature=temperature,
-        max_new_tokens=256,
-        do_sample=True,
-        top_k=50,
-        top_p=0.95,
+
+
+def build_system_prefix(tokenizer: PreTrainedTokenizerBase) -> str:
+    messages = [{"role": "system", "content": system_prompt}]
+    return tokenizer.apply_chat_template(messages, tokenize=False)
+
+
+def generate_texts(
+    pipe: Pipeline,
+    prompts: list[str],
+    temperatures: list[float],
+    streamer: BaseStreamer | None = None,
+    cancellations: list[CancellationToken | None] | None = None,
+) -> list[str]:
+    tokenizer, model = pipe.tokenizer, pipe.model
+    chat_prompts = [build_chat_prompt(tokenizer, prompt) for prompt in prompts]
+    # batched decoder-only generation needs a pad token and left padding
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    tokenizer.padding_side = "left"
+    inputs = tokenizer(chat_prompts, return_tensors="pt", padding=True).to(model.device)
+    past_key_values = None
+    if len(prompts) == 1 and settings.prefix_cache_enabled:
+        # cached prefixes assume the prompt starts at position 0, i.e. no padding
+        past_key_values = prefix_cache.lookup(pipe, inputs.input_ids[0])
+    start_time = time.perf_counter()
+    with torch.inference_mode():
+        outputs = model.generate(
+            **inputs,
+            max_new_tokens=text_generation_params["max_new_tokens"],
+            do_sample=True,
+            top_k=0,
+            top_p=1.0,
+            logits_processor=build_logits_processor(temperatures),
+            stopping_criteria=build_stopping_criteria(cancellations or [None] * len(prompts)),
+            pad_token_id=tokenizer.pad_token_id,
+            past_key_values=past_key_values,
+            # streamers only support a batch of one prompt
+            streamer=streamer,
+        )
+    new_tokens = outputs[:, inputs.input_ids.shape[1] :]
+    metrics.observe(
+        "text_generation_tokens_per_second",
+        new_tokens.numel() / (time.perf_counter() - start_time),
+        decoding="standard",
     )
-    output = predictions[0]["generated_text"].split("</s>\n<|assistant|>\n")[-1]
-    return output
+    return tokenizer.batch_decode(new_tokens, skip_special_tokens=True)
+
+
+def eos_token_ids(pipe: Pipeline) -> set[int]:
+    eos_token_id = pipe.model.generation_config.eos_token_id
+    ids = set(eos_token_id) if isinstance(eos_token_id, list) else {eos_token_id}
+    return {i for i in ids | {pipe.tokenizer.eos_token_id} if i is not None}
+
+
+def generate_text_prompt_lookup(
+    pipe: Pipeline,
+    prompt: str,
+    temperature: float = 0.7,
+    streamer: BaseStreamer | None = None,
+    cancellation: CancellationToken | None = None,
+) -> str:
+    """Drafts tokens from n-grams of the prompt, worth it when answers copy spans of the context."""
+    tokenizer, model = pipe.tokenizer, pipe.model
+    input_ids = tokenizer(build_chat_prompt(tokenizer, prompt), return_tensors="pt").input_ids[0]
+    input_ids = input_ids.to(model.device)
+    past_key_values = None
+    if settings.prefix_cache_enabled:
+        past_key_values = prefix_cache.lookup(pipe, input_ids)
+    new_tokens, stats = prompt_lookup_generate(
+        model,
+        input_ids,
+        past_key_values or DynamicCache(),
+        build_logits_processor([temperature]),
+        max_new_tokens=text_generation_params["max_new_tokens"],
+        eos_token_ids=eos_token_ids(pipe),
+        num_draft_tokens=settings.prompt_lookup_num_tokens,
+        max_ngram=settings.prompt_lookup_max_ngram,
+        streamer=streamer,
+        cancellation=cancellation,
+    )
+    logger.debug(
+        f"Prompt lookup accepted {stats.acceptance_rate:.0%} of {stats.drafted_tokens} drafted "
+        f"tokens at {stats.tokens_per_second:.1f} tokens/s",
+    )
+    return tokenizer.decode(new_tokens, skip_special_tokens=True)
+
+
+def generate_text(
+    pipe: Pipeline,
+    prompt: str,
+    temperature: float = 0.7,
+    streamer: BaseStreamer | None = None,
+    prompt_lookup: bool = False,
+    cancellation: CancellationToken | None = None,
+) -> str:
+    if prompt_lookup:
+        return generate_text_prompt_lookup(pipe, prompt, temperature, streamer, cancellation)
+    return generate_texts(pipe, [prompt], [temperature], streamer, [cancellation])[0]
+
+
+def resume_conversation_cache(conversation_id: int, input_ids: torch.Tensor) -> DynamicCache | None:
+    if (entry := conversation_kv_cache.take(conversation_id)) is None:
+        return None
+    # earlier turns are re-rendered from the stored text, which may tokenize slightly
+    # differently from the generated tokens, so only the common prefix is reused
+    reused_tokens = min(common_prefix_length(entry.input_ids, input_ids), len(input_ids) - 1)
+    if reused_tokens <= 0:
+        return None
+    entry.past_key_values.crop(reused_tokens)
+    metrics.observe("conversation_kv_cache_reused_tokens", reused_tokens)
+    return entry.past_key_values
+
+
+def generate_conversation_turn(
+    pipe: Pipeline,
+    history: list[tuple[str, str]],
+    prompt: str,
+    temperature: float,
+    conversation_id: int,
+    streamer: BaseStreamer | None = None,
+    cancellation: CancellationToken | None = None,
+) -> str:
+    """Generates the next assistant message, only prefilling the tokens added since the last turn."""
+    tokenizer, model = pipe.tokenizer, pipe.model
+    messages = [{"role": "system", "content": system_prompt}]
+    for prompt_content, response_content in history:
+        messages.append({"role": "user", "content": prompt_content})
+        messages.append({"role": "assistant", "content": response_content})
+    messages.append({"role": "user", "content": prompt})
+    chat_prompt = tokenizer.apply_chat_template(
+        messages,
+        tokenize=False,
+        add_generation_prompt=True,
+    )
+    inputs = tokenizer(chat_prompt, return_tensors="pt").to(model.device)
+    input_ids = inputs.input_ids[0]
+
+    past_key_values = resume_conversation_cache(conversation_id, input_ids)
+    if past_key_values is None and settings.prefix_cache_enabled:
+        past_key_values = prefix_cache.lookup(pipe, input_ids)
+    if past_key_values is None:
+        past_key_values = DynamicCache()
+    with torch.inference_mode():
+        outputs = model.generate(
+            **inputs,
+            max_new_tokens=text_generation_params["max_new_tokens"],
+            do_sample=True,
+            top_k=0,
+            top_p=1.0,
+            logits_processor=build_logits_processor([temperature]),
+            stopping_criteria=build_stopping_criteria([cancellation]),
+            pad_token_id=tokenizer.eos_token_id,
+            past_key_values=past_key_values,
+            streamer=streamer,
+            return_dict_in_generate=True,
+        )
+    sequence = outputs.sequences[0]
+    # the last generated token is never fed back to the model, so it isn't cached
+    cached_length = outputs.past_key_values.get_seq_length()
+    conversation_kv_cache.put(conversation_id, sequence[:cached_length], outputs.past_key_values)
+    return tokenizer.decode(sequence[len(input_ids) :], skip_special_tokens=True)
 
 
 async def generate_text_vllm(prompt: str, temperature: float = 0.7) -> str:
@@ -122,8 +372,16 @@ def load_image_model() -> StableDiffusionInpaintPipelineLegacy:
     return pipe
 
 
-def generate_image(pipe: StableDiffusionInpaintPipelineLegacy, prompt: str) -> Image.Image:
-    output = pipe(prompt, num_inference_steps=10).images[0]
+def generate_image(
+    pipe: StableDiffusionInpaintPipelineLegacy,
+    prompt: str,
+    cancellation: CancellationToken | None = None,
+) -> Image.Image:
+    output = pipe(
+        prompt,
+        num_inference_steps=10,
+        callback_on_step_end=cancellation_callback(cancellation),
+    ).images[0]
     return output
 
 
@@ -144,10 +402,17 @@ def generate_video(
     pipe: StableVideoDiffusionPipeline,
     image: Image.Image,
     num_frames: int = 25,
+    cancellation: CancellationToken | None = None,
 ) -> list[Image.Image]:
     image = image.resize((1024, 576))
     generator = torch.manual_seed(42)
-    frames = pipe(image, decode_chunk_size=8, generator=generator, num_frames=num_frames).frames[0]
+    frames = pipe(
+        image,
+        decode_chunk_size=8,
+        generator=generator,
+        num_frames=num_frames,
+        callback_on_step_end=cancellation_callback(cancellation),
+    ).frames[0]
     return frames
 
 
@@ -168,3 +433,10 @@ def generate_3d_geometry(
         output_type="mesh",
     ).images[0]
     return images
+
+
+model_registry.register("text2text", load_text_model)
+model_registry.register("text2audio", load_audio_model)
+model_registry.register("text2image", load_image_model)
+model_registry.register("image2video", load_video_model)
+prefix_cache.register("system_prompt", build_system_prefix)
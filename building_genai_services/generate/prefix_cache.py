@@ -0,0 +1,89 @@
+import copy
+import threading
+import weakref
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import torch
+from transformers import DynamicCache, Pipeline, PreTrainedTokenizerBase
+
+from building_genai_services.common.metrics import metrics
+
+# a static prefix is either literal text or rendered from the model's tokenizer,
+# e.g. the chat template applied to the system message
+StaticPrefix = str | Callable[[PreTrainedTokenizerBase], str]
+
+
+@dataclass
+class PrefixEntry:
+    name: str
+    input_ids: torch.Tensor
+    past_key_values: DynamicCache
+
+
+def common_prefix_length(a: torch.Tensor, b: torch.Tensor) -> int:
+    length = min(len(a), len(b))
+    mismatches = (a[:length] != b[:length]).nonzero()
+    return int(mismatches[0]) if len(mismatches) else length
+
+
+class PrefixCache:
+    """Precomputed past key values of registered static prompt prefixes.
+
+    Generation starts from a copy of the cache of the longest registered
+    prefix shared with the prompt, so only the remaining tokens are prefilled.
+    Caches are built lazily per model instance and dropped with the model.
+    """
+
+    def __init__(self, min_prefix_tokens: int = 8) -> None:
+        self.min_prefix_tokens = min_prefix_tokens
+        self._prefixes: dict[str, StaticPrefix] = {}
+        self._entries: weakref.WeakKeyDictionary[torch.nn.Module, list[PrefixEntry]] = (
+            weakref.WeakKeyDictionary()
+        )
+        # lookups run on executor threads
+        self._lock = threading.Lock()
+
+    def register(self, name: str, prefix: StaticPrefix) -> None:
+        with self._lock:
+            self._prefixes[name] = prefix
+            self._entries.clear()
+
+    def _build(self, pipe: Pipeline) -> list[PrefixEntry]:
+        entries = []
+        for name, prefix in self._prefixes.items():
+            text = prefix(pipe.tokenizer) if callable(prefix) else prefix
+            input_ids = pipe.tokenizer(text, return_tensors="pt").input_ids.to(pipe.model.device)
+            with torch.inference_mode():
+                outputs = pipe.model(
+                    input_ids=input_ids,
+                    past_key_values=DynamicCache(),
+                    use_cache=True,
+                )
+            entries.append(PrefixEntry(name, input_ids[0], outputs.past_key_values))
+        return entries
+
+    def lookup(self, pipe: Pipeline, input_ids: torch.Tensor) -> DynamicCache | None:
+        """Returns a private copy of the best matching prefix cache for an unpadded prompt."""
+        with self._lock:
+            if pipe.model not in self._entries:
+                self._entries[pipe.model] = self._build(pipe)
+            entries = self._entries[pipe.model]
+        best, best_length = None, 0
+        for entry in entries:
+            length = common_prefix_length(entry.input_ids, input_ids)
+            if length > best_length:
+                best, best_length = entry, length
+        # at least one prompt token has to be left for the model to process
+        best_length = min(best_length, len(input_ids) - 1)
+        if best is None or best_length < self.min_prefix_tokens:
+            metrics.increment("prefix_cache_misses_total")
+            return None
+        past_key_values = copy.deepcopy(best.past_key_values)
+        past_key_values.crop(best_length)
+        metrics.increment("prefix_cache_hits_total", prefix=best.name)
+        metrics.observe("prefix_cache_reused_tokens", best_length)
+        return past_key_values
+
+
+prefix_cache = PrefixCache()
@@ -0,0 +1,111 @@
+import time
+from dataclasses import dataclass
+
+import torch
+from transformers import DynamicCache, LogitsProcessorList, PreTrainedModel
+from transformers.generation.streamers import BaseStreamer
+
+from building_genai_services.common.cancellation import CancellationToken
+from building_genai_services.common.metrics import metrics
+
+
+@dataclass
+class PromptLookupStats:
+    drafted_tokens: int = 0
+    accepted_tokens: int = 0
+    generated_tokens: int = 0
+    seconds: float = 0.0
+
+    @property
+    def acceptance_rate(self) -> float:
+        return self.accepted_tokens / self.drafted_tokens if self.drafted_tokens else 0.0
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.generated_tokens / self.seconds if self.seconds else 0.0
+
+
+def find_draft(sequence: torch.Tensor, max_ngram: int, num_draft_tokens: int) -> torch.Tensor:
+    """Returns the tokens that followed the latest earlier occurrence of the sequence's trailing n-gram.
+
+    Longer n-grams are tried first, so drafts copy spans that are most likely
+    to be repeated, e.g. quoted context in RAG augmented prompts.
+    """
+    length = len(sequence)
+    for n in range(min(max_ngram, length - 1), 0, -1):
+        windows = sequence.unfold(0, n, 1)[:-1]
+        matches = (windows == sequence[-n:]).all(dim=1).nonzero()
+        for start in reversed(matches.flatten().tolist()):
+            draft = sequence[start + n : start + n + num_draft_tokens]
+            if len(draft):
+                return draft
+    return sequence[:0]
+
+
+def prompt_lookup_generate(
+    model: PreTrainedModel,
+    input_ids: torch.Tensor,
+    past_key_values: DynamicCache,
+    logits_processor: LogitsProcessorList,
+    max_new_tokens: int,
+    eos_token_ids: set[int],
+    num_draft_tokens: int = 10,
+    max_ngram: int = 3,
+    streamer: BaseStreamer | None = None,
+    cancellation: CancellationToken | None = None,
+) -> tuple[torch.Tensor, PromptLookupStats]:
+    """Samples up to ``max_new_tokens`` for an unpadded prompt, verifying drafted tokens in one forward pass.
+
+    Each drafted token is kept while it equals the token sampled from the
+    model at its position, so the output follows the same distribution as
+    regular sampling and a mismatch costs no more than a regular step.
+    ``past_key_values`` may already cover a prefix of the prompt.
+    """
+    stats = PromptLookupStats()
+    start_time = time.perf_counter()
+    sequence = input_ids
+    if streamer is not None:
+        streamer.put(sequence.cpu())
+    with torch.inference_mode():
+        # the cache always covers every token but the last one of the sequence
+        if past_key_values.get_seq_length() < len(sequence) - 1:
+            model(
+                input_ids=sequence[past_key_values.get_seq_length() : -1].unsqueeze(0),
+                past_key_values=past_key_values,
+                use_cache=True,
+            )
+        generated = 0
+        while generated < max_new_tokens:
+            if cancellation is not None and cancellation.cancelled:
+                break
+            remaining = max_new_tokens - generated
+            draft = find_draft(sequence, max_ngram, min(num_draft_tokens, remaining - 1))
+            cached_length = past_key_values.get_seq_length()
+            logits = model(
+                input_ids=torch.cat([sequence[-1:], draft]).unsqueeze(0),
+                past_key_values=past_key_values,
+                use_cache=True,
+            ).logits[0]
+            scores = logits_processor(sequence.unsqueeze(0), logits.float())
+            sampled = torch.multinomial(scores.softmax(dim=-1), num_samples=1).flatten()
+            mismatches = (sampled[: len(draft)] != draft).nonzero()
+            accepted = int(mismatches[0]) if len(mismatches) else len(draft)
+            new_tokens = sampled[: accepted + 1]
+            if eos := [i for i, t in enumerate(new_tokens.tolist()) if t in eos_token_ids]:
+                new_tokens = new_tokens[: eos[0] + 1]
+            stats.drafted_tokens += len(draft)
+            stats.accepted_tokens += min(accepted, len(new_tokens))
+            sequence = torch.cat([sequence, new_tokens])
+            generated += len(new_tokens)
+            past_key_values.crop(cached_length + len(new_tokens))
+            if streamer is not None:
+                streamer.put(new_tokens.cpu())
+            if eos:
+                break
+    if streamer is not None:
+        streamer.end()
+    stats.generated_tokens = generated
+    stats.seconds = time.perf_counter() - start_time
+    metrics.observe("prompt_lookup_acceptance_rate", stats.acceptance_rate)
+    metrics.observe("text_generation_tokens_per_second", stats.tokens_per_second, decoding="prompt_lookup")
+    return sequence[len(input_ids) :], stats
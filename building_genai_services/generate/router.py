@@ -18,9 +18,17 @@ from fastapi.responses import StreamingResponse
 from loguru import logger
 from PIL import Image
 
+from building_genai_services.common.cancellation import cancel_on_disconnect
+from building_genai_services.common.executors import model_executors
+from building_genai_services.common.registry import ModelRegistryDep
 from building_genai_services.common.session import DBSessionDep
-from building_genai_services.conversations import GetConversationDep, store_message
+from building_genai_services.conversations import (
+    ConversationService,
+    GetConversationDep,
+    store_message,
+)
 from building_genai_services.rag import (
+    get_prompt_embedding,
     get_rag_content,
     get_urls_content,
     pdf_text_extractor,
@@ -28,24 +36,26 @@ from building_genai_services.rag import (
     vector_service,
 )
 
+from .dependencies import AudioModelDep, ImageModelDep, VideoModelDep
 from .models import (
     # generate_3d_geometry,
     generate_audio,
+    generate_conversation_turn,
     generate_image,
     generate_text,
+    generate_text_prompt_lookup,
     generate_text_vllm,
     generate_video,
+    text_model_quantization,
     # load_3d_model,
-    load_audio_model,
-    load_image_model,
-    load_text_model,
-    load_video_model,
 )
 from .schemas import (
     TextModelRequest,
     TextModelResponse,
     VoicePresets,
 )
+from .services import TextGenerationServiceDep
+from .streaming import SSE_HEADERS, stream_text_events
 from .utils import (
     audio_array_to_buffer,
     export_to_video_buffer,
@@ -62,10 +72,40 @@ async def stream_llm_controller(
     background_task: BackgroundTasks,
     session: DBSessionDep,
     conversation: GetConversationDep,
+    models: ModelRegistryDep,
+    stream: bool = False,
 ):
     print(f"{conversation.id = }")
-    pipe = load_text_model()
-    output = generate_text(pipe, prompt, 0.01)
+    messages = await ConversationService(session).list_messages(conversation.id)
+    history = [(m.prompt_content, m.response_content) for m in messages]
+    # turns continue from the conversation's cached attention state, so they aren't batched
+    generation_args = (history, prompt, 0.01, conversation.id)
+    if stream:
+
+        async def persist_message(content: str) -> None:
+            await store_message(prompt, content, conversation.id, session)
+
+        return StreamingResponse(
+            stream_text_events(
+                models,
+                generate_conversation_turn,
+                generation_args,
+                "tinyLlama",
+                0.01,
+                request.client.host,
+                on_complete=persist_message,
+            ),
+            media_type="text/event-stream",
+            headers=SSE_HEADERS,
+        )
+    async with cancel_on_disconnect(request) as cancellation, models.acquire("text2text") as pipe:
+        output = await model_executors.run(
+            "text2text",
+            generate_conversation_turn,
+            pipe,
+            *generation_args,
+            cancellation=cancellation,
+        )
     background_task.add_task(
         store_message,
         prompt,
@@ -76,6 +116,7 @@ async def stream_llm_controller(
     res = TextModelResponse(
         model="tinyLlama",
         temperature=0.01,
+        quantization=text_model_quantization(),
         content=output,
         ip=request.client.host,
     )
@@ -88,9 +129,13 @@ async def stream_llm_controller(
 @router.post("/text", response_model_exclude_defaults=True)
 async def serve_text_to_text_controller(
     request: Request,
+    response: Response,
+    models: ModelRegistryDep,
+    text_generation_service: TextGenerationServiceDep,
     body: TextModelRequest = Body(...),
     urls_content: str = Depends(get_urls_content),
     rag_content: str = Depends(get_rag_content),
+    prompt_embedding: list[float] = Depends(get_prompt_embedding),
 ) -> TextModelResponse:
     logger.info(f"{body.model =}")
     logger.info(f"{urls_content =}")
@@ -100,11 +145,33 @@ async def serve_text_to_text_controller(
             status_code=status.HTTP_400_BAD_REQUEST,
         )
     prompt = body.prompt + " " + urls_content + rag_content
-    pipe = load_text_model()
-    output = generate_text(pipe, prompt, body.temperature)
+    if body.stream:
+        return StreamingResponse(
+            stream_text_events(
+                models,
+                generate_text_prompt_lookup if body.prompt_lookup else generate_text,
+                (prompt, body.temperature),
+                body.model,
+                body.temperature,
+                request.client.host,
+            ),
+            media_type="text/event-stream",
+            headers=SSE_HEADERS,
+        )
+    async with cancel_on_disconnect(request) as cancellation:
+        output, cache_status = await text_generation_service.generate(
+            body,
+            prompt,
+            urls_content + rag_content,
+            prompt_embedding,
+            cancellation,
+        )
+    if cache_status is not None:
+        response.headers["X-Cache"] = cache_status
     res = TextModelResponse(
         model=body.model,
         temperature=body.temperature,
+        quantization=text_model_quantization(),
         content=output,
         ip=request.client.host,
     )
@@ -134,12 +201,20 @@ async def serve_vllm_text_to_text_controller(
     responses={status.HTTP_200_OK: {"content": {"audio/wav": {}}}},
     response_class=StreamingResponse,
 )
-def serve_text_to_audio_model_controller(
+async def serve_text_to_audio_model_controller(
     prompt: str,
+    audio_model: AudioModelDep,
     preset: VoicePresets = "v2/en_speaker_1",
 ):
-    processor, model = load_audio_model()
-    output, sample_rate = generate_audio(processor, model, prompt, preset)
+    processor, model = audio_model
+    output, sample_rate = await model_executors.run(
+        "text2audio",
+        generate_audio,
+        processor,
+        model,
+        prompt,
+        preset,
+    )
     return StreamingResponse(
         audio_array_to_buffer(output, sample_rate),
         media_type="audio/wav",
@@ -151,9 +226,13 @@ def serve_text_to_audio_model_controller(
     responses={status.HTTP_200_OK: {"content": {"image/png": {}}}},
     response_class=Response,
 )
-def serve_text_to_image_model_controller(prompt: str):
-    pipe = load_image_model()
-    output = generate_image(pipe, prompt)
+async def serve_text_to_image_model_controller(
+    request: Request,
+    prompt: str,
+    pipe: ImageModelDep,
+):
+    async with cancel_on_disconnect(request) as cancellation:
+        output = await model_executors.run("text2image", generate_image, pipe, prompt, cancellation)
     return Response(content=img_to_bytes(output), media_type="image/png")
 
 
@@ -162,11 +241,26 @@ def serve_text_to_image_model_controller(prompt: str):
     responses={status.HTTP_200_OK: {"content": {"video/mp4": {}}}},
     response_class=StreamingResponse,
 )
-def serve_image_to_video_model_controller(image: bytes = File(...), num_frames: int = 25):
+async def serve_image_to_video_model_controller(
+    request: Request,
+    model: VideoModelDep,
+    image: bytes = File(...),
+    num_frames: int = 25,
+):
     image = Image.open(BytesIO(image))
-    model = load_video_model()
-    frames = generate_video(model, image, num_frames)
-    return StreamingResponse(export_to_video_buffer(frames), media_type="video/mp4")
+    async with cancel_on_disconnect(request) as cancellation:
+        frames = await model_executors.run(
+            "image2video",
+            generate_video,
+            model,
+            image,
+            num_frames,
+            cancellation,
+        )
+        cancellation.raise_if_cancelled()
+        # h264 encoding is CPU bound too
+        buffer = await model_executors.run("image2video", export_to_video_buffer, frames)
+    return StreamingResponse(buffer, media_type="video/mp4")
 
 
 # def serve_text_to_3d_model_controller(
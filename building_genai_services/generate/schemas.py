@@ -18,6 +18,7 @@ from .utils import count_tokens
 VoicePresets = Literal["v2/en_speaker_1", "v2/en_speaker_9"]
 
 SupportedTextModels: TypeAlias = Literal["tinyLlama", "gemma2b"]
+TextModelQuantization: TypeAlias = Literal["none", "int8"]
 TokenCount = Annotated[int, Field(ge=0)]
 PriceTable: TypeAlias = dict[SupportedTextModels, float]
 price_table: PriceTable = {"tinyLlama": 0.0030, "gemma2b": 0.0200}
@@ -81,11 +82,19 @@ class TextModelRequest(BaseModel):
     model: Literal["tinyLlama", "gemma2b"]
     prompt: str
     temperature: float = 0.1
+    # stream tokens as Server-Sent Events instead of returning the finished response
+    stream: bool = False
+    # set to false to skip reusing answers to near-duplicate prompts
+    semantic_cache: bool = True
+    # draft tokens from n-grams of the prompt and its context, verified in one forward pass
+    prompt_lookup: bool = False
 
 
 class TextModelResponse(ModelResponse):
     model: SupportedTextModels
     temperature: Annotated[float, Field(ge=0.0, le=1.0, default=0.1)]
+    # weight format of the local model that generated the content, None for remote models
+    quantization: TextModelQuantization | None = None
     # price: Annotated[float, Field(ge=0, default=0.0)]
 
     @computed_field
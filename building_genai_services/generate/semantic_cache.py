@@ -0,0 +1,118 @@
+import time
+from dataclasses import dataclass
+from typing import Annotated
+
+import numpy as np
+from fastapi import Depends
+
+from building_genai_services.common.metrics import metrics
+from building_genai_services.common.settings import settings
+
+
+@dataclass
+class SemanticCacheEntry:
+    prompt: str
+    content: str
+    created_at: float
+    last_used_at: float
+
+
+class SemanticCacheScope:
+    """Normalized prompt embeddings and their responses for a single model."""
+
+    def __init__(self) -> None:
+        self.vectors: np.ndarray | None = None
+        self.entries: list[SemanticCacheEntry] = []
+
+    def remove(self, indices: set[int]) -> None:
+        keep = [i for i in range(len(self.entries)) if i not in indices]
+        self.entries = [self.entries[i] for i in keep]
+        self.vectors = self.vectors[keep] if keep else None
+
+
+class SemanticCache:
+    """In-process vector store of prompt/response pairs for reusing answers to near-duplicate prompts.
+
+    Each model has its own scope. Entries expire after ``ttl_seconds`` and the
+    least recently used entry of a scope is evicted beyond ``max_entries``.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float,
+        max_entries: int,
+        ttl_seconds: float,
+        max_temperature: float,
+    ) -> None:
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_temperature = max_temperature
+        self._scopes: dict[str, SemanticCacheScope] = {}
+
+    def is_cacheable(self, temperature: float) -> bool:
+        return self.max_entries > 0 and temperature <= self.max_temperature
+
+    @staticmethod
+    def normalize(vector: list[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    def _expire(self, scope: SemanticCacheScope) -> None:
+        cutoff = time.time() - self.ttl_seconds
+        expired = {i for i, entry in enumerate(scope.entries) if entry.created_at < cutoff}
+        if expired:
+            scope.remove(expired)
+
+    def lookup(self, model: str, vector: list[float]) -> SemanticCacheEntry | None:
+        scope = self._scopes.get(model)
+        if scope is not None:
+            self._expire(scope)
+        if scope is None or scope.vectors is None:
+            metrics.increment("semantic_cache_misses_total", model=model)
+            return None
+        similarities = scope.vectors @ self.normalize(vector)
+        best = int(np.argmax(similarities))
+        metrics.observe("semantic_cache_best_similarity", float(similarities[best]), model=model)
+        if similarities[best] < self.similarity_threshold:
+            metrics.increment("semantic_cache_misses_total", model=model)
+            return None
+        metrics.increment("semantic_cache_hits_total", model=model)
+        entry = scope.entries[best]
+        entry.last_used_at = time.time()
+        return entry
+
+    def store(self, model: str, prompt: str, vector: list[float], content: str) -> None:
+        scope = self._scopes.setdefault(model, SemanticCacheScope())
+        self._expire(scope)
+        if len(scope.entries) >= self.max_entries:
+            least_recently_used = min(
+                range(len(scope.entries)),
+                key=lambda i: scope.entries[i].last_used_at,
+            )
+            scope.remove({least_recently_used})
+            metrics.increment("semantic_cache_evictions_total", model=model)
+        now = time.time()
+        scope.entries.append(SemanticCacheEntry(prompt, content, now, now))
+        row = self.normalize(vector)[np.newaxis, :]
+        scope.vectors = row if scope.vectors is None else np.vstack([scope.vectors, row])
+        metrics.set_gauge("semantic_cache_entries", len(scope.entries), model=model)
+
+    def clear(self) -> None:
+        self._scopes.clear()
+
+
+semantic_cache = SemanticCache(
+    similarity_threshold=settings.semantic_cache_similarity_threshold,
+    max_entries=settings.semantic_cache_max_entries,
+    ttl_seconds=settings.semantic_cache_ttl_seconds,
+    max_temperature=settings.semantic_cache_max_temperature,
+)
+
+
+def get_semantic_cache() -> SemanticCache:
+    return semantic_cache
+
+
+SemanticCacheDep = Annotated[SemanticCache, Depends(get_semantic_cache)]
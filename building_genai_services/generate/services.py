@@ -0,0 +1,100 @@
+from typing import Annotated
+
+from fastapi import Depends
+
+from building_genai_services.common.cancellation import CancellationToken
+from building_genai_services.common.executors import model_executors
+from building_genai_services.common.registry import ModelRegistry, ModelRegistryDep
+
+from .batching import TextBatcher, TextBatcherDep
+from .cache import ResponseCache, ResponseCacheDep
+from .models import generate_text_prompt_lookup, text_generation_params, text_model_quantization
+from .schemas import TextModelRequest
+from .semantic_cache import SemanticCache, SemanticCacheDep
+
+
+class TextGenerationService:
+    def __init__(
+        self,
+        models: ModelRegistry,
+        batcher: TextBatcher,
+        cache: ResponseCache,
+        semantic_cache: SemanticCache,
+    ) -> None:
+        self.models = models
+        self.batcher = batcher
+        self.cache = cache
+        self.semantic_cache = semantic_cache
+
+    async def generate(
+        self,
+        body: TextModelRequest,
+        prompt: str,
+        context: str,
+        prompt_embedding: list[float],
+        cancellation: CancellationToken | None = None,
+    ) -> tuple[str, str | None]:
+        """Returns the generated text and the cache status reported in the X-Cache header."""
+        cache_key = None
+        if self.cache.is_cacheable(body.temperature):
+            cache_key = self.cache.key(
+                body.model,
+                body.prompt,
+                body.temperature,
+                context,
+                # int8 and fp32 weights don't produce identical text
+                {**text_generation_params, "quantization": text_model_quantization()},
+            )
+            if (output := await self.cache.get(cache_key)) is not None:
+                return output, "HIT"
+
+        use_semantic_cache = body.semantic_cache and self.semantic_cache.is_cacheable(
+            body.temperature,
+        )
+        if use_semantic_cache:
+            if entry := self.semantic_cache.lookup(body.model, prompt_embedding):
+                return entry.content, "SEMANTIC-HIT"
+
+        output = await self.complete(body, prompt, cancellation)
+        if cancellation is not None:
+            # never cache the partial output of a cancelled generation
+            cancellation.raise_if_cancelled()
+        if cache_key is not None:
+            await self.cache.set(cache_key, output)
+        if use_semantic_cache:
+            self.semantic_cache.store(body.model, body.prompt, prompt_embedding, output)
+        return output, "MISS" if cache_key is not None or use_semantic_cache else None
+
+    async def complete(
+        self,
+        body: TextModelRequest,
+        prompt: str,
+        cancellation: CancellationToken | None = None,
+    ) -> str:
+        if not body.prompt_lookup:
+            return await self.batcher.submit(prompt, body.temperature, cancellation)
+        # drafts are verified against a single unpadded sequence, so these skip the batcher
+        async with self.models.acquire("text2text") as pipe:
+            return await model_executors.run(
+                "text2text",
+                generate_text_prompt_lookup,
+                pipe,
+                prompt,
+                body.temperature,
+                cancellation=cancellation,
+            )
+
+
+def get_text_generation_service(
+    models: ModelRegistryDep,
+    batcher: TextBatcherDep,
+    cache: ResponseCacheDep,
+    semantic_cache: SemanticCacheDep,
+) -> TextGenerationService:
+    return TextGenerationService(models, batcher, cache, semantic_cache)
+
+
+TextGenerationServiceDep = Annotated[
+    TextGenerationService,
+    Depends(get_text_generation_service),
+]
@@ -0,0 +1,100 @@
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
+
+from loguru import logger
+from transformers import AsyncTextIteratorStreamer, Pipeline
+
+from building_genai_services.common.cancellation import CancellationToken
+from building_genai_services.common.executors import model_executors
+from building_genai_services.common.metrics import metrics
+from building_genai_services.common.registry import ModelRegistry
+
+from .models import text_model_quantization
+from .schemas import SupportedTextModels, TextModelResponse
+from .utils import to_sse
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def run_generation(
+    generate: Callable[..., str],
+    pipe: Pipeline,
+    args: tuple[Any, ...],
+    streamer: AsyncTextIteratorStreamer,
+    cancellation: CancellationToken,
+    errors: list[Exception],
+) -> None:
+    try:
+        generate(pipe, *args, streamer=streamer, cancellation=cancellation)
+    except Exception as e:
+        logger.error(f"Streamed text generation failed - Error: {e}")
+        errors.append(e)
+        # unblock the consumer, generate() only ends the streamer on success
+        streamer.end()
+
+
+async def stream_text_events(
+    models: ModelRegistry,
+    generate: Callable[..., str],
+    args: tuple[Any, ...],
+    model: SupportedTextModels,
+    temperature: float,
+    ip: str | None,
+    on_complete: Callable[[str], Awaitable[None]] | None = None,
+) -> AsyncIterator[str]:
+    """Yields tokens as Server-Sent Events while the text2text executor runs ``generate(pipe, *args)``.
+
+    The final ``done`` event carries the token count and cost of the full
+    message, which is then handed to ``on_complete``.
+    """
+    async with models.acquire("text2text") as pipe:
+        streamer = AsyncTextIteratorStreamer(
+            pipe.tokenizer,
+            skip_prompt=True,
+            skip_special_tokens=True,
+        )
+        cancellation = CancellationToken()
+        errors: list[Exception] = []
+        generation = asyncio.ensure_future(
+            model_executors.run(
+                "text2text",
+                run_generation,
+                generate,
+                pipe,
+                args,
+                streamer,
+                cancellation,
+                errors,
+            ),
+        )
+        chunks = []
+        try:
+            async for token in streamer:
+                if not token:
+                    continue
+                chunks.append(token)
+                yield to_sse({"token": token})
+        except (asyncio.CancelledError, GeneratorExit):
+            logger.info("Cancelled streamed text generation after the client disconnected")
+            metrics.increment("generation_cancelled_total", endpoint="stream")
+            raise
+        finally:
+            # the response is closed early when the client disconnects, stop decoding too
+            cancellation.cancel()
+        await generation
+
+    if errors:
+        yield to_sse({"detail": "Text generation failed"}, event="error")
+        return
+    content = "".join(chunks)
+    res = TextModelResponse(
+        model=model,
+        temperature=temperature,
+        quantization=text_model_quantization(),
+        content=content,
+        ip=ip,
+    )
+    yield to_sse(res.model_dump(mode="json", exclude={"content"}), event="done")
+    if on_complete is not None:
+        await on_complete(content)
@@ -1,5 +1,6 @@
 # import os
 # import tempfile
+import json
 from io import BytesIO
 # from pathlib import Path
 from typing import Literal, TypeAlias
@@ -43,6 +44,12 @@ def export_to_video_buffer(images: list[Image.Image]) -> BytesIO:
     output.mux(packet)
     return buffer
 
+def to_sse(data: dict, event: str | None = None) -> str:
+    """Formats a Server-Sent Event; ``data`` is sent as a single JSON line."""
+    message = f"event: {event}\n" if event else ""
+    return message + f"data: {json.dumps(data)}\n\n"
+
+
 def count_tokens(text: str | None) -> int:
     if text is None:
         logger.warning("Response is None. Assuming 0 tokens used")
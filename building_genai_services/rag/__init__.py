@@ -1,10 +1,11 @@
-from .dependencies import get_rag_content, get_urls_content
+from .dependencies import get_prompt_embedding, get_rag_content, get_urls_content
 from .extractor import pdf_text_extractor
 from .services import vector_service
 from .upload import save_file
 
 # Type aliases need to be explicitly exported through an __init__.py file
 __all__ = [
+    "get_prompt_embedding",
     "get_rag_content",
     "get_urls_content",
     "pdf_text_extractor",
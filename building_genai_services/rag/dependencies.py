@@ -1,6 +1,8 @@
-from fastapi import Body
+from fastapi import Body, Depends
 from loguru import logger
 
+from building_genai_services.common.executors import model_executors
+from building_genai_services.common.registry import model_registry
 from building_genai_services.generate.schemas import TextModelRequest
 
 from .scraper import extract_urls, fetch_all
@@ -20,8 +22,15 @@ async def get_urls_content(body: TextModelRequest = Body(...)) -> str:
     return ""
 
 
-async def get_rag_content(body: TextModelRequest = Body(...)) -> str:
-    rag_content = await vector_service.search("knowledgebase", embed(body.prompt), 3, 0.7)
+async def get_prompt_embedding(body: TextModelRequest = Body(...)) -> list[float]:
+    # FastAPI caches dependencies per request, so the prompt is embedded once
+    # for both the RAG search and the semantic cache lookup
+    async with model_registry.acquire("embedder") as embedder:
+        return await model_executors.run("embedder", embed, embedder, body.prompt)
+
+
+async def get_rag_content(query_vector: list[float] = Depends(get_prompt_embedding)) -> str:
+    rag_content = await vector_service.search("knowledgebase", query_vector, 3, 0.7)
     rag_content_str = "\n".join([c.payload["original_text"] for c in rag_content])
 
     return rag_content_str
@@ -2,6 +2,9 @@ import os
 
 from loguru import logger
 
+from building_genai_services.common.executors import model_executors
+from building_genai_services.common.registry import model_registry
+
 from .repository import VectorRepository
 from .transform import clean, embed, load
 
@@ -19,12 +22,18 @@ class VectorService(VectorRepository):
     ) -> None:
         await self.create_collection(collection_name, collection_size)
         logger.debug(f"Inserting {filepath} content into database")
-        async for chunk in load(filepath, chunk_size):
-            logger.debug(f"Inserting '{chunk[0:20]}...' into database")
-
-            embedding_vector = embed(clean(chunk))
-            filename = os.path.basename(filepath)
-            await self.create(collection_name, embedding_vector, chunk, filename)
+        async with model_registry.acquire("embedder") as embedder:
+            async for chunk in load(filepath, chunk_size):
+                logger.debug(f"Inserting '{chunk[0:20]}...' into database")
+
+                embedding_vector = await model_executors.run(
+                    "embedder",
+                    embed,
+                    embedder,
+                    clean(chunk),
+                )
+                filename = os.path.basename(filepath)
+                await self.create(collection_name, embedding_vector, chunk, filename)
 
 
 vector_service = VectorService()
@@ -3,11 +3,15 @@ from collections.abc import AsyncGenerator
 from typing import Any
 
 import aiofiles
-from transformers import AutoModel
+from transformers import AutoModel, PreTrainedModel
+
+from building_genai_services.common.registry import model_registry
 
 DEFAULT_CHUNK_SIZE = 1024 * 1024 * 50  # 50 megabytes
 
-embedder = AutoModel.from_pretrained("jinaai/jina-embeddings-v2-base-en", trust_remote_code=True)
+
+def load_embedding_model() -> PreTrainedModel:
+    return AutoModel.from_pretrained("jinaai/jina-embeddings-v2-base-en", trust_remote_code=True)
 
 
 async def load(filepath: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncGenerator[str, Any]:
@@ -26,5 +30,8 @@ def clean(text: str) -> str:
     return cleaned_text
 
 
-def embed(text: str) -> list[float]:
+def embed(embedder: PreTrainedModel, text: str) -> list[float]:
     return embedder.encode(text).tolist()
+
+
+model_registry.register("embedder", load_embedding_model)
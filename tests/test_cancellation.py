@@ -0,0 +1,107 @@
+import asyncio
+import json
+import time
+
+import pytest
+import torch
+
+from building_genai_services.api.app import app
+from building_genai_services.common.cancellation import CancellationToken
+from building_genai_services.common.executors import model_executors
+from building_genai_services.common.metrics import metrics
+from building_genai_services.common.registry import model_registry
+from building_genai_services.generate.models import CancellationStoppingCriteria
+from building_genai_services.rag import get_prompt_embedding, get_rag_content, get_urls_content
+
+
+async def no_content():
+    return ""
+
+
+async def fake_prompt_embedding():
+    return [1.0, 0.0]
+
+
+def generate_until_cancelled(pipe, prompts, temperatures, cancellations):
+    deadline = time.perf_counter() + 5
+    while not all(c is not None and c.cancelled for c in cancellations):
+        if time.perf_counter() > deadline:
+            return ["finished"] * len(prompts)
+        time.sleep(0.01)
+    return ["partial"] * len(prompts)
+
+
+async def post_and_disconnect(path: str, body: dict, disconnect_after: float) -> list[dict]:
+    """Sends a request through the ASGI app and drops the connection before the response."""
+    sent_body = False
+    disconnect_at = time.perf_counter() + disconnect_after
+    messages = []
+
+    async def receive():
+        nonlocal sent_body
+        if not sent_body:
+            sent_body = True
+            return {"type": "http.request", "body": json.dumps(body).encode(), "more_body": False}
+        # is_disconnected() only accepts messages that are already queued
+        if (remaining := disconnect_at - time.perf_counter()) > 0:
+            await asyncio.sleep(remaining)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"host", b"test")],
+        "client": ("127.0.0.1", 5000),
+        "server": ("test", 80),
+    }
+    await app(scope, receive, send)
+    return messages
+
+
+@pytest.fixture
+def cancellable_app(mocker):
+    mocker.patch(
+        "building_genai_services.generate.batching.generate_texts",
+        side_effect=generate_until_cancelled,
+    )
+    model_registry.register("text2text", lambda: object())
+    app.dependency_overrides[get_urls_content] = no_content
+    app.dependency_overrides[get_rag_content] = no_content
+    app.dependency_overrides[get_prompt_embedding] = fake_prompt_embedding
+    yield app
+    app.dependency_overrides.clear()
+
+
+def test_stopping_criteria_finishes_cancelled_rows():
+    cancelled = CancellationToken()
+    cancelled.cancel()
+    criteria = CancellationStoppingCriteria([None, cancelled, CancellationToken()])
+    done = criteria(torch.zeros(3, 4, dtype=torch.long), torch.zeros(3, 8))
+    assert done.tolist() == [False, True, False]
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_text_generation(cancellable_app):
+    start_time = time.perf_counter()
+    messages = await post_and_disconnect(
+        "/generate/text",
+        {"model": "tinyLlama", "prompt": "Tell me a long story", "temperature": 0.9},
+        disconnect_after=0.2,
+    )
+    latency = time.perf_counter() - start_time
+
+    assert messages[0]["status"] == 499
+    assert latency < 2
+    assert model_executors.inflight("text2text") == 0
+    counters = metrics.snapshot()["counters"]
+    assert counters['generation_cancelled_total{endpoint="/generate/text"}'] >= 1
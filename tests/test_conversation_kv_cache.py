@@ -0,0 +1,39 @@
+import torch
+from transformers import DynamicCache
+
+from building_genai_services.common.kv_cache import ConversationKVCache, cache_nbytes
+
+
+def make_cache(length: int) -> DynamicCache:
+    cache = DynamicCache()
+    cache.update(torch.zeros(1, 1, length, 4), torch.zeros(1, 1, length, 4), 0)
+    return cache
+
+
+def test_take_hands_out_the_entry_once():
+    store = ConversationKVCache(max_bytes=10_000, ttl_seconds=60)
+    store.put(1, torch.arange(3), make_cache(3))
+    entry = store.take(1)
+    assert entry is not None
+    assert entry.past_key_values.get_seq_length() == 3
+    assert store.take(1) is None
+
+
+def test_least_recently_used_conversation_is_evicted_beyond_the_memory_limit():
+    one_entry = cache_nbytes(make_cache(4))
+    store = ConversationKVCache(max_bytes=2 * one_entry, ttl_seconds=60)
+    for conversation_id in (1, 2, 3):
+        store.put(conversation_id, torch.arange(4), make_cache(4))
+    assert store.take(1) is None
+    assert store.take(2) is not None
+    assert store.take(3) is not None
+
+
+def test_expired_and_invalidated_entries_are_not_reused():
+    store = ConversationKVCache(max_bytes=10_000, ttl_seconds=0)
+    store.put(1, torch.arange(3), make_cache(3))
+    assert store.take(1) is None
+    store.ttl_seconds = 60
+    store.put(2, torch.arange(3), make_cache(3))
+    store.invalidate(2)
+    assert store.take(2) is None
@@ -0,0 +1,83 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+
+from building_genai_services.api.app import app
+from building_genai_services.common.registry import model_registry
+from building_genai_services.common.session.session import get_db_session
+from building_genai_services.rag import get_prompt_embedding, get_rag_content, get_urls_content
+
+
+class FakeResult:
+    def scalars(self):
+        return self
+
+    def all(self):
+        return []
+
+
+class FakeSession:
+    @asynccontextmanager
+    async def begin(self):
+        yield
+
+    async def execute(self, statement):
+        return FakeResult()
+
+
+async def fake_db_session():
+    yield FakeSession()
+
+
+async def no_content():
+    return ""
+
+
+async def fake_prompt_embedding():
+    return [1.0, 0.0]
+
+
+def slow_generate_texts(pipe, prompts, temperatures):
+    time.sleep(1)
+    return ["generated"] * len(prompts)
+
+
+@pytest.fixture
+async def client(mocker):
+    mocker.patch(
+        "building_genai_services.generate.batching.generate_texts",
+        side_effect=slow_generate_texts,
+    )
+    model_registry.register("text2text", lambda: object())
+    app.dependency_overrides[get_db_session] = fake_db_session
+    app.dependency_overrides[get_urls_content] = no_content
+    app.dependency_overrides[get_rag_content] = no_content
+    app.dependency_overrides[get_prompt_embedding] = fake_prompt_embedding
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_db_endpoints_stay_responsive_during_generation(client):
+    generation = asyncio.create_task(
+        client.post("/generate/text", json={"model": "tinyLlama", "prompt": "Tell me a joke"}),
+    )
+    # give the generation time to reach the executor
+    await asyncio.sleep(0.2)
+
+    start_time = time.perf_counter()
+    response = await client.get("/conversations")
+    latency = time.perf_counter() - start_time
+
+    assert response.status_code == 200
+    assert not generation.done()
+    assert latency < 0.25
+
+    response = await generation
+    assert response.status_code == 200
+    assert response.json()["content"] == "generated"
@@ -0,0 +1,82 @@
+import pytest
+import torch
+
+from building_genai_services.common.registry import ModelRegistry
+from building_genai_services.common.registry.registry import estimate_model_bytes
+
+
+class FakeTensor:
+    def __init__(self, numel: int) -> None:
+        self._numel = numel
+
+    def numel(self) -> int:
+        return self._numel
+
+    def element_size(self) -> int:
+        return 4
+
+
+class FakeModule:
+    def __init__(self, numel: int) -> None:
+        self.weights = [FakeTensor(numel)]
+
+    def parameters(self):
+        return iter(self.weights)
+
+    def buffers(self):
+        return iter([])
+
+
+@pytest.fixture
+def registry():
+    registry = ModelRegistry(memory_budget_bytes=1000)
+    registry.register("small", lambda: FakeModule(100))  # 400 bytes
+    registry.register("medium", lambda: FakeModule(125))  # 500 bytes
+    registry.register("large", lambda: FakeModule(200))  # 800 bytes
+    return registry
+
+
+@pytest.mark.asyncio
+async def test_models_load_once(registry):
+    async with registry.acquire("small") as first:
+        pass
+    async with registry.acquire("small") as second:
+        pass
+    assert first is second
+    assert registry.used_bytes == 400
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_model_is_evicted(registry):
+    await registry.load(["small", "medium"])
+    async with registry.acquire("small"):
+        pass
+    await registry.load(["large"])
+    assert "medium" not in registry
+    assert "small" not in registry
+    assert "large" in registry
+
+
+@pytest.mark.asyncio
+async def test_model_in_use_is_never_evicted(registry):
+    async with registry.acquire("large") as large:
+        async with registry.acquire("medium"):
+            assert "large" in registry
+        assert registry.stats()["models"]["large"]["in_use"] == 1
+    assert large is not None
+    await registry.load(["small"])
+    assert "large" not in registry
+
+
+@pytest.mark.asyncio
+async def test_unknown_model_raises(registry):
+    with pytest.raises(KeyError):
+        async with registry.acquire("unknown"):
+            pass
+
+
+def test_size_estimate_counts_int8_packed_weights():
+    model = torch.nn.Sequential(torch.nn.Linear(64, 64, bias=False))
+    fp32_bytes = estimate_model_bytes(model)
+    torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    assert estimate_model_bytes(model) == fp32_bytes // 4
@@ -0,0 +1,49 @@
+import torch
+from transformers import DynamicCache, LlamaConfig, LlamaForCausalLM, LogitsProcessorList
+
+from building_genai_services.generate.models import BatchTemperatureLogitsWarper
+from building_genai_services.generate.prompt_lookup import find_draft, prompt_lookup_generate
+
+
+def test_draft_continues_the_longest_matching_ngram():
+    sequence = torch.tensor([1, 2, 3, 9, 4, 2, 3, 7, 5, 2, 3])
+    assert find_draft(sequence, max_ngram=2, num_draft_tokens=2).tolist() == [7, 5]
+    assert find_draft(sequence, max_ngram=3, num_draft_tokens=2).tolist() == [7, 5]
+
+
+def test_no_draft_without_a_match():
+    assert find_draft(torch.tensor([1, 2, 3]), max_ngram=3, num_draft_tokens=4).tolist() == []
+
+
+def test_near_greedy_output_matches_regular_decoding():
+    torch.manual_seed(0)
+    config = LlamaConfig(
+        vocab_size=64,
+        hidden_size=32,
+        intermediate_size=64,
+        num_hidden_layers=2,
+        num_attention_heads=4,
+        num_key_value_heads=4,
+    )
+    model = LlamaForCausalLM(config).eval()
+    input_ids = torch.tensor([5, 6, 7, 8, 9, 10, 5, 6, 7, 8, 9, 10, 5, 6])
+    expected = model.generate(
+        input_ids.unsqueeze(0),
+        max_new_tokens=16,
+        do_sample=False,
+        eos_token_id=None,
+        pad_token_id=0,
+    )[0, len(input_ids) :]
+
+    new_tokens, stats = prompt_lookup_generate(
+        model,
+        input_ids,
+        DynamicCache(),
+        LogitsProcessorList([BatchTemperatureLogitsWarper([0.0])]),
+        max_new_tokens=16,
+        eos_token_ids=set(),
+    )
+
+    assert new_tokens.tolist() == expected.tolist()
+    assert stats.generated_tokens == 16
+    assert stats.drafted_tokens > 0
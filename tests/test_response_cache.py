@@ -0,0 +1,83 @@
+import pytest
+
+from building_genai_services.generate.cache import (
+    InMemoryCacheBackend,
+    ResponseCache,
+    SQLiteCacheBackend,
+)
+
+sampling_params = {"max_new_tokens": 256, "top_k": 50, "top_p": 0.95}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend_factory(request, tmp_path):
+    def factory(ttl_seconds: float = 60, max_entries: int = 2):
+        if request.param == "memory":
+            return InMemoryCacheBackend(ttl_seconds, max_entries)
+        return SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"), ttl_seconds, max_entries)
+
+    return factory
+
+
+@pytest.mark.asyncio
+async def test_cache_round_trip(backend_factory):
+    backend = backend_factory()
+    await backend.set("key", "value")
+    assert await backend.get("key") == "value"
+    assert await backend.get("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_are_not_returned(backend_factory):
+    backend = backend_factory(ttl_seconds=-1)
+    await backend.set("key", "value")
+    assert await backend.get("key") is None
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_entry_is_evicted(backend_factory, mocker):
+    backend = backend_factory(max_entries=2)
+    clock = mocker.patch("building_genai_services.generate.cache.time.time", return_value=100.0)
+    await backend.set("a", "1")
+    clock.return_value = 101.0
+    await backend.set("b", "2")
+    clock.return_value = 102.0
+    assert await backend.get("a") == "1"
+    clock.return_value = 103.0
+    await backend.set("c", "3")
+    assert await backend.get("b") is None
+    assert await backend.get("a") == "1"
+    assert await backend.get("c") == "3"
+
+
+def test_key_normalizes_prompt_whitespace():
+    first = ResponseCache.key("tinyLlama", "  Tell me   a joke ", 0.1, "", sampling_params)
+    second = ResponseCache.key("tinyLlama", "Tell me a joke", 0.1, "", sampling_params)
+    assert first == second
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"model": "gemma2b"},
+        {"temperature": 0.2},
+        {"context": "retrieved document"},
+        {"sampling_params": {**sampling_params, "top_k": 10}},
+    ],
+)
+def test_key_depends_on_generation_inputs(changes):
+    params = {
+        "model": "tinyLlama",
+        "prompt": "Tell me a joke",
+        "temperature": 0.1,
+        "context": "",
+        "sampling_params": sampling_params,
+    }
+    assert ResponseCache.key(**params) != ResponseCache.key(**{**params, **changes})
+
+
+def test_only_low_temperatures_are_cacheable():
+    cache = ResponseCache(InMemoryCacheBackend(60, 10), max_temperature=0.2)
+    assert cache.is_cacheable(0.1)
+    assert not cache.is_cacheable(0.7)
+    assert not ResponseCache(None, max_temperature=0.2).is_cacheable(0.1)
@@ -0,0 +1,50 @@
+import pytest
+
+from building_genai_services.generate.semantic_cache import SemanticCache
+
+
+@pytest.fixture
+def cache():
+    return SemanticCache(
+        similarity_threshold=0.9,
+        max_entries=2,
+        ttl_seconds=60,
+        max_temperature=0.2,
+    )
+
+
+def test_similar_prompt_reuses_cached_response(cache):
+    cache.store("tinyLlama", "Tell me a joke", [1.0, 0.0, 0.0], "A joke")
+    entry = cache.lookup("tinyLlama", [0.99, 0.1, 0.0])
+    assert entry is not None
+    assert entry.content == "A joke"
+
+
+def test_dissimilar_prompt_misses(cache):
+    cache.store("tinyLlama", "Tell me a joke", [1.0, 0.0, 0.0], "A joke")
+    assert cache.lookup("tinyLlama", [0.0, 1.0, 0.0]) is None
+
+
+def test_entries_are_scoped_per_model(cache):
+    cache.store("tinyLlama", "Tell me a joke", [1.0, 0.0, 0.0], "A joke")
+    assert cache.lookup("gemma2b", [1.0, 0.0, 0.0]) is None
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    cache.store("tinyLlama", "first", [1.0, 0.0, 0.0], "1")
+    cache.store("tinyLlama", "second", [0.0, 1.0, 0.0], "2")
+    assert cache.lookup("tinyLlama", [1.0, 0.0, 0.0]).content == "1"
+    cache.store("tinyLlama", "third", [0.0, 0.0, 1.0], "3")
+    assert cache.lookup("tinyLlama", [0.0, 1.0, 0.0]) is None
+    assert cache.lookup("tinyLlama", [1.0, 0.0, 0.0]).content == "1"
+
+
+def test_expired_entries_are_dropped():
+    cache = SemanticCache(
+        similarity_threshold=0.9,
+        max_entries=2,
+        ttl_seconds=-1,
+        max_temperature=0.2,
+    )
+    cache.store("tinyLlama", "Tell me a joke", [1.0, 0.0, 0.0], "A joke")
+    assert cache.lookup("tinyLlama", [1.0, 0.0, 0.0]) is None
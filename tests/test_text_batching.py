@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from building_genai_services.common.registry import ModelRegistry
+from building_genai_services.generate.batching import TextBatcher
+
+
+@pytest.fixture
+def batcher(mocker):
+    calls = []
+
+    def fake_generate_texts(pipe, prompts, temperatures):
+        calls.append((prompts, temperatures))
+        return [f"{prompt} @ {temperature}" for prompt, temperature in zip(prompts, temperatures)]
+
+    mocker.patch(
+        "building_genai_services.generate.batching.generate_texts",
+        side_effect=fake_generate_texts,
+    )
+    registry = ModelRegistry()
+    registry.register("text2text", lambda: object())
+    batcher = TextBatcher(registry, max_batch_size=4, max_wait_ms=50)
+    batcher.calls = calls
+    return batcher
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_a_batch(batcher):
+    outputs = await asyncio.gather(
+        batcher.submit("a", 0.1),
+        batcher.submit("b", 0.5),
+        batcher.submit("c", 0.9),
+    )
+    await batcher.stop()
+    assert outputs == ["a @ 0.1", "b @ 0.5", "c @ 0.9"]
+    assert batcher.calls == [(["a", "b", "c"], [0.1, 0.5, 0.9])]
+
+
+@pytest.mark.asyncio
+async def test_batches_are_capped_at_max_batch_size(batcher):
+    outputs = await asyncio.gather(*[batcher.submit(str(i), 0.1) for i in range(6)])
+    await batcher.stop()
+    assert outputs == [f"{i} @ 0.1" for i in range(6)]
+    assert [len(prompts) for prompts, _ in batcher.calls] == [4, 2]